@@ -5,6 +5,7 @@ License: GNU GPL 2.0
 
 from loguru import logger
 import functools
+import os
 import sys
 
 
@@ -61,11 +62,19 @@ class PathMLLogger:
             **kwargs (dict, optional):
                 additional options passed to configure logger. See:
                 `loguru documentation <https://loguru.readthedocs.io/en/stable/api/logger.html#loguru._logger.Logger.add>`_
+                Unless specified, ``backtrace`` and ``diagnose`` are turned off, and messages logged to a file
+                are written by a background thread (``enqueue=True``).
         """
         logger.enable("pathml")
         logger.enable(__name__)
         # remove pre-configured logger (https://github.com/Delgan/loguru/issues/208#issuecomment-581002215)
         logger.remove(0)
+        # diagnose inspects the variables of every frame in a traceback, which is slow
+        kwargs.setdefault("backtrace", False)
+        kwargs.setdefault("diagnose", False)
+        # keep file I/O off the calling thread
+        if isinstance(sink, (str, os.PathLike)):
+            kwargs.setdefault("enqueue", True)
         handler_id = logger.add(sink=sink, level=level, format=fmt, **kwargs)
         logger.info("Enabled Logging For PathML!")
         return handler_id
@@ -75,19 +84,28 @@ class PathMLLogger:
 # https://loguru.readthedocs.io/en/stable/resources/recipes.html#:~:text=or%20fallback%20policy.-,Logging%20entry%20and%20exit%20of%20functions%20with%20a%20decorator,-%EF%83%81
 def logger_wraps(*, entry=True, exit=True, level="DEBUG"):
     def wrapper(func):
+        # no entry/exit logging when running with python -O, so that wrapped functions have no overhead
+        if not __debug__ or not (entry or exit):
+            return func
+
         name = func.__name__
 
         @functools.wraps(func)
         def wrapped(*args, **kwargs):
-            logger_ = logger.opt(depth=1)
+            # lazy, so that args and result (e.g. large arrays) are only formatted if the record is emitted
+            logger_ = logger.opt(depth=1, lazy=True).bind(enter_exit=True)
             if entry:
-                logger_.bind(enter_exit=True).log(
-                    level, "Entering '{}' (args={}, kwargs={})", name, args, kwargs
+                logger_.log(
+                    level,
+                    "Entering '{}' (args={}, kwargs={})",
+                    lambda: name,
+                    lambda: args,
+                    lambda: kwargs,
                 )
             result = func(*args, **kwargs)
             if exit:
-                logger_.bind(enter_exit=True).log(
-                    level, "Exiting '{}' (result={})", name, result
+                logger_.log(
+                    level, "Exiting '{}' (result={})", lambda: name, lambda: result
                 )
             return result
 
@@ -3,10 +3,10 @@ Copyright 2021, Dana-Farber Cancer Institute and Weill Cornell Medicine
 License: GNU GPL 2.0
 """
 
-import itertools
+import bisect
 import os
 import tempfile
-from collections import OrderedDict
+import uuid
 
 import anndata
 from loguru import logger
@@ -15,20 +15,67 @@ import numpy as np
 import pathml.core
 import pathml.core.masks
 import pathml.core.tile
-from pathml.core.utils import readcounts
+from pathml.core.utils import (
+    H5_CHUNK_CACHE,
+    readarrayh5,
+    readcounts,
+    readtupleh5,
+    tile_chunk_shape,
+    tupletoh5,
+    writetupleh5,
+)
 
 
 class h5pathManager:
     """
     Interface between slidedata object and data management on disk by h5py.
+
+    Args:
+        h5path (h5py.File, optional): h5path file to copy into the manager
+        slidedata (pathml.core.slide_data.SlideData, optional): SlideData object to create a new h5path for
+        compression (str, optional): compression filter for tiles and masks. Defaults to ``"lzf"``,
+            which is fast and always available in h5py. Use ``"gzip"`` for smaller files at the cost of slower writes.
+        compression_opts (int, optional): options for the compression filter, e.g. gzip level.
+            Must be ``None`` for ``"lzf"``, which takes no options.
+        in_memory (bool, optional): Whether to keep the h5 file entirely in RAM instead of in a temporary file on disk.
+            Reading and writing tiles is faster in memory, but all tiles of the slide must then fit in RAM,
+            which is often not the case for whole-slide images. Defaults to ``False``.
     """
 
-    def __init__(self, h5path=None, slidedata=None):
-        path = tempfile.TemporaryFile()
-        f = h5py.File(path, "w")
+    def __init__(
+        self,
+        h5path=None,
+        slidedata=None,
+        compression="lzf",
+        compression_opts=None,
+        in_memory=False,
+    ):
+        if compression == "lzf" and compression_opts is not None:
+            raise ValueError(
+                f"lzf compression takes no options, but got compression_opts={compression_opts}"
+            )
+        self.compression = {
+            "compression": compression,
+            "compression_opts": compression_opts,
+        }
+        # use a larger chunk cache, so that chunks of slide-level masks stay decompressed
+        # while consecutive tiles are sliced from them
+        if in_memory:
+            # keep the h5 file in memory using the core driver, without writing it to disk.
+            # name must be unique, because h5py can't open two files with the same name.
+            f = h5py.File(
+                f"{uuid.uuid4().hex}.h5",
+                "w",
+                driver="core",
+                backing_store=False,
+                **H5_CHUNK_CACHE,
+            )
+        else:
+            path = tempfile.TemporaryFile()
+            f = h5py.File(path, "w", **H5_CHUNK_CACHE)
+            # keep a reference to the h5 tempfile so that it is never garbage collected
+            self.h5reference = path
         self.h5 = f
-        # keep a reference to the h5 tempfile so that it is never garbage collected
-        self.h5reference = path
         # create temporary file for slidedata.counts
         self.countspath = tempfile.TemporaryDirectory()
         self.counts = anndata.AnnData()
@@ -62,23 +109,36 @@ class h5pathManager:
             labelsgroup = self.h5["fields"].create_group("labels")
             if slidedata.labels:
                 for key, label in slidedata.labels.items():
-                    self.h5["fields/labels"].attrs[key] = label
+                    labelsgroup.attrs[key] = label
             # slidetype
             slidetypegroup = self.h5["fields"].create_group("slide_type")
             if slidedata.slide_type:
                 for key, val in slidedata.slide_type.asdict().items():
-                    self.h5["fields/slide_type"].attrs[key] = val
+                    slidetypegroup.attrs[key] = val
             # tiles
             tilesgroup = self.h5.create_group("tiles")
             # initialize tile_shape with zeros
-            tilesgroup.attrs["tile_shape"] = b"(0, 0)"
+            writetupleh5(tilesgroup, "tile_shape", (0, 0))
             # initialize stride with 0
-            tilesgroup.attrs["tile_stride"] = b"(0, 0)"
+            writetupleh5(tilesgroup, "tile_stride", (0, 0))
             # masks
             masksgroup = self.h5.create_group("masks")
             # counts
             countsgroup = self.h5.create_group("counts")
 
+        # keep handles to the tiles and masks groups, instead of looking them up by name on every call
+        self._tilesgroup = self.h5["tiles"]
+        self._masksgroup = self.h5["masks"]
+        # keep sorted lists of tile and mask keys, so that indexing by int does not need to list the group members
+        # on every call. keys are sorted explicitly, because groups that track creation order (e.g. written with
+        # track_order=True) list their members in that order instead of by name
+        self._tile_keys = sorted(self._tilesgroup.keys())
+        self._mask_keys = sorted(self._masksgroup.keys())
+        # keep slide-level mask datasets open, so that their chunk caches persist between calls
+        self._maskdatasets = {key: self._masksgroup[key] for key in self._mask_keys}
+        # keep tile_shape as a tuple, so that it does not need to be parsed from the attribute for every tile
+        self._tile_shape = readtupleh5(self._tilesgroup, "tile_shape")
+
         slide_type_dict = {
             key: val for key, val in self.h5["fields/slide_type"].attrs.items()
         }
@@ -88,6 +148,20 @@ class h5pathManager:
         rep = f"h5pathManager object, backing a SlideData object named '{self.h5['fields'].attrs['name']}'"
         return rep
 
+    @property
+    def tile_keys(self):
+        """
+        Keys of all tiles, sorted by name. This is the order used when indexing tiles by int.
+        """
+        return list(self._tile_keys)
+
+    @property
+    def mask_keys(self):
+        """
+        Keys of all slide-level masks, sorted by name. This is the order used when indexing masks by int.
+        """
+        return list(self._mask_keys)
+
     def add_tile(self, tile):
         """
         Add a tile to h5path.
@@ -95,19 +169,81 @@ class h5pathManager:
         Args:
             tile(pathml.core.tile.Tile): Tile object
         """
-        if str(tile.coords) in self.h5["tiles"].keys():
+        self.add_tiles([tile])
+
+    def add_tiles(self, tiles):
+        """
+        Add several tiles to h5path.
+
+        Args:
+            tiles(list[pathml.core.tile.Tile]): Tile objects
+        """
+        for tile in tiles:
+            self._write_tile(tile)
+            if tile.counts:
+                # buffer counts, they are concatenated onto self.counts once, when counts are next accessed
+                self._pending_counts[str(tile.coords)] = tile.counts
+
+    @property
+    def counts(self):
+        """
+        Counts of all tiles, as an AnnData object backed by a temporary file.
+        """
+        if self._pending_counts:
+            self._flush_counts()
+        return self._counts
+
+    @counts.setter
+    def counts(self, value):
+        self._counts = value
+        self._pending_counts = {}
+
+    def _flush_counts(self):
+        """
+        Concatenate buffered tile counts onto self.counts in a single pass.
+        Concatenating once per tile would read all counts so far into RAM on every tile.
+        """
+        newcounts = list(self._pending_counts.values())
+        self._pending_counts = {}
+        # cannot concatenate on disk, read into RAM, concatenate, write back to disk
+        if self._counts:
+            counts = self._counts.to_memory()
+            counts = counts.concatenate(*newcounts, join="outer")
+            del counts.obs["batch"]
+        # cannot concatenate empty AnnData object so set to tile.counts then set filename
+        # so the h5ad object is backed by tempfile
+        elif len(newcounts) == 1:
+            counts = newcounts[0]
+        else:
+            counts = newcounts[0].concatenate(*newcounts[1:], join="outer")
+            del counts.obs["batch"]
+        counts.filename = os.path.join(self.countspath.name + "/tmpfile.h5ad")
+        self._counts = counts
+
+    def _write_tile(self, tile):
+        """
+        Write a tile to h5path, without adding its counts.
+
+        Args:
+            tile(pathml.core.tile.Tile): Tile object
+        """
+        key = str(tile.coords)
+        # look up the tile once, the result is used again when writing
+        exists = key in self._tilesgroup
+        if exists:
             logger.info(f"Tile is already in tiles. Overwriting {tile.coords} inplace.")
             # remove old cells from self.counts so they do not duplicate
             if tile.counts:
-                if "tile" in self.counts.obs.keys():
-                    self.counts = self.counts[self.counts.obs["tile"] != tile.coords]
+                self._pending_counts.pop(key, None)
+                if "tile" in self._counts.obs.keys():
+                    self._counts = self._counts[self._counts.obs["tile"] != tile.coords]
         # check that the tile matches tile_shape
-        existing_shape = eval(self.h5["tiles"].attrs["tile_shape"])
+        existing_shape = self._tile_shape
         if all([s == 0 for s in existing_shape]):
             # in this case, tile_shape isn't specified (zeros placeholder)
             # so we set it from the tile image shape
-            self.h5["tiles"].attrs["tile_shape"] = str(tile.image.shape).encode("utf-8")
-            existing_shape = tile.image.shape
+            writetupleh5(self._tilesgroup, "tile_shape", tile.image.shape)
+            self._tile_shape = existing_shape = tile.image.shape
 
         if any(
             [s1 != s2 for s1, s2 in zip(tile.image.shape[0:2], existing_shape[0:2])]
@@ -126,66 +262,45 @@ class h5pathManager:
                 self.slide_type = tile.slide_type
 
         # create a group for tile and write tile
-        if str(tile.coords) in self.h5["tiles"]:
-            logger.info(f"overwriting tile at {str(tile.coords)}")
-            del self.h5["tiles"][str(tile.coords)]
-        self.h5["tiles"].create_group(str(tile.coords))
-        self.h5["tiles"][str(tile.coords)].create_dataset(
+        if exists:
+            del self._tilesgroup[key]
+        else:
+            bisect.insort(self._tile_keys, key)
+        tilegroup = self._tilesgroup.create_group(key)
+        tilegroup.create_dataset(
             "array",
             data=tile.image,
-            chunks=True,
-            compression="gzip",
-            compression_opts=5,
+            chunks=tile_chunk_shape(tile.image.shape, np.dtype("float16").itemsize),
             shuffle=True,
             dtype="float16",
+            **self.compression,
         )
 
-        # save tile_shape as an attribute to enforce consistency
-        if "tile_shape" not in self.h5["tiles"].attrs or (
-            "tile_shape" in self.h5["tiles"].attrs
-            and self.h5["tiles"].attrs["tile_shape"] == b"(0, 0)"
-        ):
-            self.h5["tiles"].attrs["tile_shape"] = str(tile.image.shape).encode("utf-8")
-
         if tile.masks:
             # create a group to hold tile-level masks
-            if "masks" not in self.h5["tiles"][str(tile.coords)].keys():
-                masksgroup = self.h5["tiles"][str(tile.coords)].create_group("masks")
-
+            tilemasksgroup = tilegroup.create_group("masks")
             # add tile-level masks
             for key, mask in tile.masks.items():
-                self.h5["tiles"][str(tile.coords)]["masks"].create_dataset(
+                tilemasksgroup.create_dataset(
                     str(key),
                     data=mask,
+                    chunks=tile_chunk_shape(mask.shape, np.dtype("float16").itemsize),
+                    shuffle=True,
                     dtype="float16",
+                    **self.compression,
                 )
 
-        # add coords
-        self.h5["tiles"][str(tile.coords)].attrs["coords"] = (
-            str(tile.coords) if tile.coords else 0
-        )
-        # add name
-        self.h5["tiles"][str(tile.coords)].attrs["name"] = (
-            str(tile.name) if tile.name else 0
+        # add coords and name in a single pass over the tile attributes
+        tilegroup.attrs.update(
+            {
+                "coords": tupletoh5(tile.coords),
+                # fixed-length bytes, which are read back without a variable-length string lookup
+                "name": np.bytes_(str(tile.name).encode("utf-8")) if tile.name else 0,
+            }
         )
-        tilelabelsgroup = self.h5["tiles"][str(tile.coords)].create_group("labels")
+        tilelabelsgroup = tilegroup.create_group("labels")
         if tile.labels:
-            for key, val in tile.labels.items():
-                self.h5["tiles"][str(tile.coords)]["labels"].attrs[key] = val
-        if tile.counts:
-            # cannot concatenate on disk, read into RAM, concatenate, write back to disk
-            if self.counts:
-                self.counts = self.counts.to_memory()
-                self.counts = self.counts.concatenate(tile.counts, join="outer")
-                del self.counts.obs["batch"]
-                self.counts.filename = os.path.join(
-                    self.countspath.name + "/tmpfile.h5ad"
-                )
-            # cannot concatenate empty AnnData object so set to tile.counts then set filename
-            # so the h5ad object is backed by tempfile
-            else:
-                self.counts = tile.counts
-                self.counts.filename = str(self.countspath.name) + "/tmpfile.h5ad"
+            tilelabelsgroup.attrs.update(tile.labels)
 
     def get_tile(self, item):
         """
@@ -197,49 +312,163 @@ class h5pathManager:
         Returns:
             Tile(pathml.core.tile.Tile)
         """
+        tilegroup = self._tilesgroup[self._get_tile_key(item)]
+        tile = readarrayh5(tilegroup["array"])
+
+        # add masks to tile if there are masks
+        if "masks" in tilegroup:
+            masksgroup = tilegroup["masks"]
+            maskdatasets = {mask: masksgroup[mask] for mask in masksgroup}
+            shapes = {(ds.shape, ds.dtype) for ds in maskdatasets.values()}
+            if len(shapes) == 1:
+                # read all masks into one preallocated array, and return views into it
+                ((shape, dtype),) = shapes
+                stack = np.empty((len(maskdatasets),) + shape, dtype=dtype)
+                for i, ds in enumerate(maskdatasets.values()):
+                    readarrayh5(ds, out=stack[i])
+                masks = dict(zip(maskdatasets.keys(), stack))
+            else:
+                masks = {mask: readarrayh5(ds) for mask, ds in maskdatasets.items()}
+        else:
+            masks = None
+
+        return pathml.core.tile.Tile(
+            tile,
+            masks=masks,
+            slide_type=self.slide_type,
+            **self._read_tile_metadata(tilegroup),
+        )
+
+    def get_tile_image(self, item, slicer=None, out=None):
+        """
+        Retrieve only the image of a tile, without reading its masks or metadata.
+
+        Args:
+            item(int, str, tuple): key or index of tile to be retrieved
+            slicer: List where each element is an object of type slice https://docs.python.org/3/c-api/slice.html
+                    indicating how the corresponding dimension should be sliced. If None, the whole image is read.
+            out(np.ndarray, optional): array to read the image into, e.g. to reuse one buffer across many tiles.
+                Must be C-contiguous and match the shape of the (sliced) image. If None, a new array is allocated.
+
+        Returns:
+            np.ndarray: tile image
+        """
+        ds = self._tilesgroup[self._get_tile_key(item)]["array"]
+        if slicer is None:
+            return readarrayh5(ds, out=out)
+        if not _h5_can_slice(slicer):
+            image = readarrayh5(ds)[tuple(slicer)]
+            if out is None:
+                return image
+            out[...] = image
+            return out
+        if out is not None:
+            ds.read_direct(out, source_sel=tuple(slicer))
+            return out
+        return ds[tuple(slicer)]
+
+    def get_tile_metadata(self, item):
+        """
+        Retrieve only the metadata of a tile, without reading its image or masks.
+
+        Args:
+            item(int, str, tuple): key or index of tile to be retrieved
+
+        Returns:
+            dict: with keys ``name``, ``coords`` and ``labels``
+        """
+        return self._read_tile_metadata(self._tilesgroup[self._get_tile_key(item)])
+
+    def get_tile_coords(self):
+        """
+        Retrieve the coords of all tiles as a single array, without reading any images or masks.
+
+        Returns:
+            np.ndarray: array of shape (n_tiles, n_dims), with rows in the same order as the tile keys
+        """
+        coords = [
+            readtupleh5(self._tilesgroup[key], "coords") for key in self._tile_keys
+        ]
+        if not coords:
+            return np.empty((0, 0), dtype=np.int64)
+        return np.array(coords, dtype=np.int64)
+
+    def _get_tile_key(self, item):
+        """
+        Resolve a key (coords) or index of a tile to the name of its group in self.h5["tiles"].
+        """
         if isinstance(item, bool):
             raise KeyError(f"invalid key, pass str or tuple")
         if isinstance(item, (str, tuple)):
             item = str(item)
-            if item not in self.h5["tiles"].keys():
+            if item not in self._tilesgroup:
                 raise KeyError(f"key {item} does not exist")
+            return item
         elif isinstance(item, int):
-            if item > len(self.h5["tiles"].keys()) - 1:
+            if item > len(self._tile_keys) - 1:
                 raise IndexError(
-                    f'index {item} out of range for total number of tiles: {len(self.h5["tiles"].keys())}'
+                    f"index {item} out of range for total number of tiles: {len(self._tile_keys)}"
                 )
-            item = list(self.h5["tiles"].keys())[item]
+            return self._tile_keys[item]
         else:
             raise KeyError(
                 f"invalid item type: {type(item)}. must getitem by coord (type tuple[int]), index (type int), or name (type str)"
             )
-        tile = self.h5["tiles"][item]["array"][:]
-
-        # add masks to tile if there are masks
-        if "masks" in self.h5["tiles"][item].keys():
-            masks = {
-                mask: self.h5["tiles"][item]["masks"][mask][:]
-                for mask in self.h5["tiles"][item]["masks"]
-            }
-        else:
-            masks = None
 
-        labels = {
-            key: val for key, val in self.h5["tiles"][item]["labels"].attrs.items()
-        }
-        name = self.h5["tiles"][item].attrs["name"]
+    @staticmethod
+    def _read_tile_metadata(tilegroup):
+        """
+        Read name, coords and labels of a tile from its h5 group.
+        """
+        name = tilegroup.attrs.get("name")
+        if isinstance(name, bytes):
+            name = name.decode("utf-8")
         if name == "None" or name == 0:
             name = None
-        coords = eval(self.h5["tiles"][item].attrs["coords"])
+        return {
+            "name": name,
+            "coords": readtupleh5(tilegroup, "coords"),
+            "labels": dict(tilegroup["labels"].attrs.items()),
+        }
 
-        return pathml.core.tile.Tile(
-            tile,
-            masks=masks,
-            labels=labels,
-            name=name,
-            coords=coords,
-            slide_type=self.slide_type,
-        )
+    def slice_tiles(self, slicer=None, batch_size=32):
+        """
+        Generator reading tile images in batches, extending numpy array slicing.
+        Each batch is read directly into one preallocated array, instead of building a Tile object per tile.
+
+        Args:
+            slicer: List where each element is an object of type slice https://docs.python.org/3/c-api/slice.html
+                    indicating how the corresponding dimension should be sliced. If None, whole tiles are read.
+            batch_size(int): maximum number of tiles in each batch. Defaults to 32.
+        Yields:
+            keys(list[str]): keys of the tiles in the batch
+            batch(np.ndarray): tile images, stacked along the first axis
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive int, but got {batch_size}")
+        tilesgroup = self._tilesgroup
+        if not self._tile_keys:
+            return
+        first = tilesgroup[self._tile_keys[0]]["array"]
+        source_sel = tuple(slicer) if slicer is not None else ()
+        # shape of a single sliced tile, found without reading any data
+        shape = np.broadcast_to(0, first.shape)[source_sel].shape
+        for start in range(0, len(self._tile_keys), batch_size):
+            keys = self._tile_keys[start : start + batch_size]
+            batch = np.empty((len(keys),) + shape, dtype=first.dtype)
+            for i, key in enumerate(keys):
+                ds = tilesgroup[key]["array"]
+                if ds.shape != first.shape:
+                    raise ValueError(
+                        f"cannot batch tile {key} of shape {ds.shape} with tiles of shape {first.shape}"
+                    )
+                if slicer is None:
+                    readarrayh5(ds, out=batch[i])
+                elif not _h5_can_slice(slicer):
+                    batch[i] = readarrayh5(ds)[source_sel]
+                else:
+                    ds.read_direct(batch, source_sel=source_sel, dest_sel=np.s_[i])
+            yield keys, batch
 
     def remove_tile(self, key):
         """
@@ -247,9 +476,10 @@ class h5pathManager:
         """
         if not isinstance(key, (str, tuple)):
             raise KeyError(f"key must be str or tuple, check valid keys in repr")
-        if str(key) not in self.h5["tiles"].keys():
+        if str(key) not in self._tilesgroup:
             raise KeyError(f"key {key} is not in Tiles")
-        del self.h5["tiles"][str(key)]
+        del self._tilesgroup[str(key)]
+        del self._tile_keys[bisect.bisect_left(self._tile_keys, str(key))]
 
     def add_mask(self, key, mask):
         """
@@ -258,35 +488,60 @@ class h5pathManager:
 
         Args:
             key(str): mask key
-            mask(np.ndarray): mask array
+            mask(np.ndarray or h5py.Dataset): mask array. If an h5py.Dataset (e.g. a mask in another h5path file)
+                is passed, it is copied within HDF5, without reading the whole mask into memory.
         """
-        if not isinstance(mask, np.ndarray):
+        if not isinstance(mask, (np.ndarray, h5py.Dataset)):
             raise ValueError(
-                f"can not add {type(mask)}, mask must be of type np.ndarray"
+                f"can not add {type(mask)}, mask must be of type np.ndarray or h5py.Dataset"
             )
         if not isinstance(key, str):
             raise ValueError(f"invalid type {type(key)}, key must be of type str")
-        if key in self.h5["masks"].keys():
+        if key in self._masksgroup:
             raise ValueError(
                 f"key {key} already exists in 'masks'. Cannot add. Must update to modify existing mask."
             )
-        newmask = self.h5["masks"].create_dataset(key, data=mask)
+        if isinstance(mask, h5py.Dataset):
+            self._masksgroup.copy(mask, key)
+            newmask = self._masksgroup[key]
+        elif mask.ndim < 2 or mask.size == 0:
+            newmask = self._masksgroup.create_dataset(key, data=mask)
+        else:
+            # chunked and compressed like tile masks, keeping the dtype of mask.
+            # masks are mostly constant regions, so they compress well,
+            # and tiles are sliced from a few chunks instead of the whole mask
+            newmask = self._masksgroup.create_dataset(
+                key,
+                data=mask,
+                chunks=tile_chunk_shape(mask.shape, mask.dtype.itemsize),
+                shuffle=True,
+                **self.compression,
+            )
+        bisect.insort(self._mask_keys, key)
+        self._maskdatasets[key] = newmask
 
-    def update_mask(self, key, mask):
+    def update_mask(self, key, mask, slicer=None):
         """
-        Update a mask.
+        Update a mask, or a region of it.
 
         Args:
             key(str): key indicating mask to be updated
             mask(np.ndarray): mask
+            slicer: List where each element is an object of type slice https://docs.python.org/3/c-api/slice.html
+                    indicating the region of the mask to be updated. Only this region is written, without reading
+                    or rewriting the rest of the mask. If None, the whole mask is updated.
         """
-        if key not in self.h5["masks"].keys():
+        if key not in self._masksgroup:
             raise ValueError(f"key {key} does not exist. Must use add.")
-        assert self.h5["masks"][key].shape == mask.shape, (
-            f"Cannot update a mask of shape {self.h5['masks'][key].shape}"
+        maskdataset = self._maskdatasets[key]
+        selection = tuple(slicer) if slicer is not None else ()
+        # shape of the region to be updated, found without reading any data
+        shape = np.broadcast_to(0, maskdataset.shape)[selection].shape
+        assert shape == mask.shape, (
+            f"Cannot update a mask region of shape {shape}"
             f" with a mask of shape {mask.shape}. Shapes must match."
         )
-        self.h5["masks"][key][...] = mask
+        maskdataset[selection or ...] = mask
 
     def slice_masks(self, slicer):
         """
@@ -300,8 +555,21 @@ class h5pathManager:
             key(str): mask key
             val(np.ndarray): mask
         """
-        for key in self.h5["masks"].keys():
-            yield key, self.get_mask(key, slicer=slicer)
+        maskdatasets = {key: self._maskdatasets[key] for key in self._mask_keys}
+        shapes = {(ds.shape, ds.dtype) for ds in maskdatasets.values()}
+        if len(shapes) != 1 or not _h5_can_slice(slicer):
+            for key in maskdatasets:
+                yield key, self.get_mask(key, slicer=slicer)
+            return
+        # masks of the same shape are read region-by-region into one preallocated array
+        ((shape, dtype),) = shapes
+        source_sel = tuple(slicer)
+        # shape of the sliced region, found without reading any data
+        slicedshape = np.broadcast_to(0, shape)[source_sel].shape
+        stack = np.empty((len(maskdatasets),) + slicedshape, dtype=dtype)
+        for i, (key, ds) in enumerate(maskdatasets.items()):
+            ds.read_direct(stack[i], source_sel=source_sel)
+            yield key, stack[i]
 
     def get_mask(self, item, slicer=None):
         # must check bool separately, since isinstance(True, int) --> True
@@ -311,22 +579,23 @@ class h5pathManager:
             raise KeyError(f"key of type {type(item)} must be of type str or int")
 
         if isinstance(item, str):
-            if item not in self.h5["masks"].keys():
+            if item not in self._masksgroup:
                 raise KeyError(f"key {item} does not exist")
-            if slicer is None:
-                return self.h5["masks"][item][:]
-            return self.h5["masks"][item][:][tuple(slicer)]
-
+            mask_key = item
         else:
             try:
-                mask_key = list(self.h5.keys())[item]
+                mask_key = self._mask_keys[item]
             except IndexError:
                 raise ValueError(
-                    f"index out of range, valid indices are ints in [0,{len(self.h5['masks'].keys())}]"
+                    f"index out of range, valid indices are ints in [0,{len(self._mask_keys)}]"
                 )
-            if slicer is None:
-                return self.h5["masks"][mask_key][:]
-            return self.h5["masks"][mask_key][:][tuple(slicer)]
+
+        if slicer is None:
+            return readarrayh5(self._maskdatasets[mask_key])
+        if not _h5_can_slice(slicer):
+            return readarrayh5(self._maskdatasets[mask_key])[tuple(slicer)]
+        # only read the sliced region from the h5 dataset
+        return self._maskdatasets[mask_key][tuple(slicer)]
 
     def remove_mask(self, key):
         """
@@ -339,9 +608,11 @@ class h5pathManager:
             raise KeyError(
                 f"masks keys must be of type(str) but key was passed of type {type(key)}"
             )
-        if key not in self.h5["masks"].keys():
+        if key not in self._masksgroup:
             raise KeyError(f"key is not in Masks")
-        del self.h5["masks"][key]
+        del self._maskdatasets[key]
+        del self._masksgroup[key]
+        del self._mask_keys[bisect.bisect_left(self._mask_keys, key)]
 
     def get_slidetype(self):
         slide_type_dict = {
@@ -350,6 +621,14 @@ class h5pathManager:
         return pathml.core.slide_types.SlideType(**slide_type_dict)
 
 
+def _h5_can_slice(slicer):
+    """
+    Whether slicer can be applied by h5py, which only supports slices with a positive step.
+    Other slicers (e.g. reversing with ``slice(None, None, -1)``) are applied with numpy after reading the whole array.
+    """
+    return all(not isinstance(s, slice) or s.step is None or s.step > 0 for s in slicer)
+
+
 def check_valid_h5path_format(h5path):
     """
     Assert that the input h5path matches the expected h5path file format.
@@ -6,7 +6,6 @@ License: GNU GPL 2.0
 import numpy as np
 import os
 from pathlib import Path
-from collections import OrderedDict
 import h5py
 import reprlib
 from loguru import logger
@@ -44,9 +43,9 @@ class Masks:
                     raise ValueError(
                         f"can not add {type(key)}, key must be of type str"
                     )
-            self._masks = OrderedDict(masks)
+            self._masks = dict(masks)
         else:
-            self._masks = OrderedDict()
+            self._masks = {}
         for mask in self._masks:
             self.h5manager.add_mask(mask, self._masks[mask])
         del self._masks
@@ -56,7 +55,7 @@ class Masks:
         return rep
 
     def __len__(self):
-        return len(self.h5manager.h5["masks"].keys())
+        return len(self.h5manager.h5["masks"])
 
     def __getitem__(self, item):
         return self.h5manager.get_mask(item)
@@ -66,7 +65,7 @@ class Masks:
 
     @property
     def keys(self):
-        return list(self.h5manager.h5["masks"].keys())
+        return self.h5manager.mask_keys
 
     def add(self, key, mask):
         """
@@ -74,7 +73,8 @@ class Masks:
 
         Args:
             key (str): key
-            mask (np.ndarray): array of mask. Must contain elements of type int8
+            mask (np.ndarray or h5py.Dataset): array of mask. Must contain elements of type int8.
+                Masks passed as h5py.Dataset are copied without reading them into memory.
         """
         self.h5manager.add_mask(key, mask)
 
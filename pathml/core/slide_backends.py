@@ -3,6 +3,9 @@ Copyright 2021, Dana-Farber Cancer Institute and Weill Cornell Medicine
 License: GNU GPL 2.0
 """
 
+import collections
+import concurrent.futures
+import itertools
 from io import BytesIO
 from typing import Tuple
 
@@ -144,7 +147,7 @@ class OpenSlideBackend(SlideBackend):
         thumbnail = pil_to_rgb(thumbnail)
         return thumbnail
 
-    def generate_tiles(self, shape=3000, stride=None, pad=False, level=0):
+    def generate_tiles(self, shape=3000, stride=None, pad=False, level=0, prefetch=0):
         """
         Generator over tiles.
 
@@ -167,6 +170,8 @@ class OpenSlideBackend(SlideBackend):
                 Defaults to ``False``.
             level (int, optional): For slides with multiple levels, which level to extract tiles from.
                 Defaults to 0 (highest resolution).
+            prefetch (int, optional): Number of tiles to read ahead in background threads. If 0, tiles are read
+                one at a time as they are yielded. Defaults to 0.
 
         Yields:
             pathml.core.tile.Tile: Extracted Tile object
@@ -208,12 +213,34 @@ class OpenSlideBackend(SlideBackend):
         else:
             n_tiles_j = (j - shape[1]) // stride_j + 1
 
-        for ix_i in range(n_tiles_i):
-            for ix_j in range(n_tiles_j):
-                coords = (int(ix_i * stride_i), int(ix_j * stride_j))
-                # get image for tile
-                tile_im = self.extract_region(location=coords, size=shape, level=level)
-                yield pathml.core.tile.Tile(image=tile_im, coords=coords)
+        tile_coords = (
+            (int(ix_i * stride_i), int(ix_j * stride_j))
+            for ix_i in range(n_tiles_i)
+            for ix_j in range(n_tiles_j)
+        )
+
+        def read_tile(coords):
+            # get image for tile
+            return self.extract_region(location=coords, size=shape, level=level)
+
+        if not prefetch:
+            for coords in tile_coords:
+                yield pathml.core.tile.Tile(image=read_tile(coords), coords=coords)
+            return
+
+        # openslide releases the GIL while reading and decoding regions,
+        # so the next tiles are read in background threads while the caller processes the current one
+        with concurrent.futures.ThreadPoolExecutor(max_workers=prefetch) as executor:
+            pending = collections.deque(
+                (coords, executor.submit(read_tile, coords))
+                for coords in itertools.islice(tile_coords, prefetch)
+            )
+            while pending:
+                coords, future = pending.popleft()
+                # keep the queue bounded by scheduling one read for each tile yielded
+                for nextcoords in itertools.islice(tile_coords, 1):
+                    pending.append((nextcoords, executor.submit(read_tile, nextcoords)))
+                yield pathml.core.tile.Tile(image=future.result(), coords=coords)
 
 
 def _init_logger():
@@ -591,7 +618,8 @@ class BioFormatsBackend(SlideBackend):
         for ix_i in range(n_tiles_i):
             for ix_j in range(n_tiles_j):
                 coords = (int(ix_i * stride_i), int(ix_j * stride_j))
-                if coords[0] + shape[0] < i and coords[1] + shape[1] < j:
+                # tiles ending exactly at the image edge are complete, and need no padding
+                if coords[0] + shape[0] <= i and coords[1] + shape[1] <= j:
                     # get image for tile
                     tile_im = self.extract_region(
                         location=coords, size=shape, level=level, **kwargs
@@ -610,7 +638,7 @@ class BioFormatsBackend(SlideBackend):
                         list(shape)[0],
                         list(shape)[1],
                     )
-                    padded_im = np.zeros(zeroarrayshape)
+                    padded_im = np.zeros(zeroarrayshape, dtype=tile_im.dtype)
                     padded_im[: tile_im.shape[0], : tile_im.shape[1], ...] = tile_im
                     yield pathml.core.tile.Tile(image=padded_im, coords=coords)
 
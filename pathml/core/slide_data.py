@@ -50,7 +50,7 @@ class SlideData:
         name (str, optional): name of slide. If ``None``, and a ``filepath`` is provided, name defaults to filepath.
         masks (pathml.core.Masks, optional): object containing {key, mask} pairs
         tiles (pathml.core.Tiles, optional): object containing {coordinates, tile} pairs
-        labels (collections.OrderedDict, optional): dictionary containing {key, label} pairs
+        labels (dict, optional): dictionary containing {key, label} pairs
         backend (str, optional): backend to use for interfacing with slide on disk.
             Must be one of {"OpenSlide", "BioFormats", "DICOM", "h5path"} (case-insensitive).
             Note that for supported image formats, OpenSlide performance can be significantly better than BioFormats.
@@ -73,6 +73,13 @@ class SlideData:
         time_series (bool, optional): Flag indicating whether the image is a time series.
             Defaults to ``None``. Ignored if ``slide_type`` is specified.
         counts (anndata.AnnData): object containing counts matrix associated with image quantification
+        compression (str, optional): compression filter used for tiles and masks. Defaults to ``"lzf"``, which is fast
+            and always available in h5py. Use ``"gzip"`` for smaller files, e.g. for archiving, at the cost of slower
+            writes.
+        compression_opts (int, optional): options for the compression filter, e.g. gzip level from 0 to 9.
+            Must be ``None`` for ``"lzf"``.
+        in_memory (bool, optional): Whether to hold tiles and masks entirely in RAM instead of in a temporary file
+            on disk. Faster, but all tiles of the slide must fit in memory. Defaults to ``False``.
     """
 
     def __init__(
@@ -92,6 +99,9 @@ class SlideData:
         time_series=None,
         counts=None,
         dtype=None,
+        compression="lzf",
+        compression_opts=None,
+        in_memory=False,
     ):
         # check inputs
         assert masks is None or isinstance(
@@ -180,7 +190,12 @@ class SlideData:
         if _load_from_h5path:
             # populate the SlideData object from existing h5path file
             with h5py.File(filepath, "r") as f:
-                self.h5manager = pathml.core.h5managers.h5pathManager(h5path=f)
+                self.h5manager = pathml.core.h5managers.h5pathManager(
+                    h5path=f,
+                    compression=compression,
+                    compression_opts=compression_opts,
+                    in_memory=in_memory,
+                )
             self.name = self.h5manager.h5["fields"].attrs["name"]
             self.labels = {
                 key: val
@@ -197,7 +212,12 @@ class SlideData:
             if slide_type:
                 self.slide_type = SlideType(**slide_type)
         else:
-            self.h5manager = pathml.core.h5managers.h5pathManager(slidedata=self)
+            self.h5manager = pathml.core.h5managers.h5pathManager(
+                slidedata=self,
+                compression=compression,
+                compression_opts=compression_opts,
+                in_memory=in_memory,
+            )
 
         self.masks = pathml.core.Masks(h5manager=self.h5manager, masks=masks)
         self.tiles = pathml.core.Tiles(h5manager=self.h5manager, tiles=tiles)
@@ -211,15 +231,13 @@ class SlideData:
         if self.backend:
             out.append(f"backend={repr(self.backend)}")
         out.append(f"image shape: {self.shape}")
-        try:
-            nlevels = self.slide.level_count
-        except:
-            nlevels = 1
+        # slides without a backend, or backends without pyramid levels, have a single level
+        nlevels = getattr(self.slide, "level_count", 1)
         out.append(f"number of levels: {nlevels}")
         out.append(repr(self.tiles))
         out.append(repr(self.masks))
         if self.tiles:
-            out.append(f"tile_shape={eval(self.tiles.tile_shape)}")
+            out.append(f"tile_shape={self.tiles.tile_shape}")
         if self.labels:
             out.append(
                 f"{len(self.labels)} labels: {reprlib.repr(list(self.labels.keys()))}"
@@ -291,10 +309,12 @@ class SlideData:
 
         if tile_stride is None:
             tile_stride = tile_size
-        elif isinstance(tile_stride, int):
+        if isinstance(tile_stride, int):
             tile_stride = (tile_stride, tile_stride)
 
-        self.h5manager.h5["tiles"].attrs["tile_stride"] = tile_stride
+        pathml.core.utils.writetupleh5(
+            self.h5manager.h5["tiles"], "tile_stride", tile_stride
+        )
 
         shutdown_after = False
 
@@ -325,10 +345,14 @@ class SlideData:
                 processed_tile_futures.append(f)
 
             # as tiles are processed, add them to h5
-            for future, tile in dask.distributed.as_completed(
+            # gather processed tiles in batches of whatever has completed, instead of one round trip per tile
+            processed_tiles = dask.distributed.as_completed(
                 processed_tile_futures, with_results=True
-            ):
-                self.tiles.add(tile)
+            )
+            # drop our references, so each result can be released from the cluster once it is added to h5
+            del processed_tile_futures
+            for batch in processed_tiles.batches():
+                self.tiles.add_many([tile for future, tile in batch])
 
             if shutdown_after:
                 client.shutdown()
@@ -442,7 +466,7 @@ class SlideData:
         """
         try:
             thumbnail = self.slide.get_thumbnail(size=(500, 500))
-        except:
+        except (AttributeError, NotImplementedError):
             if not self.slide:
                 raise NotImplementedError(
                     f"Plotting only supported via backend, but SlideData has no backend."
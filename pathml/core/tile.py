@@ -5,7 +5,6 @@ License: GNU GPL 2.0
 
 import numpy as np
 import anndata
-from collections import OrderedDict
 import matplotlib.pyplot as plt
 import h5py
 import reprlib
@@ -123,7 +122,7 @@ class Tile:
                     )
             self.masks = masks
         else:
-            self.masks = OrderedDict()
+            self.masks = {}
 
         self.image = image
         self.name = name
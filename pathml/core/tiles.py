@@ -5,7 +5,6 @@ License: GNU GPL 2.0
 
 import os
 import reprlib
-from collections import OrderedDict
 from pathlib import Path
 from loguru import logger
 
@@ -13,6 +12,7 @@ import h5py
 import pathml.core.h5managers
 import pathml.core.masks
 import pathml.core.tile
+from pathml.core.utils import readtupleh5
 
 
 class Tiles:
@@ -42,27 +42,33 @@ class Tiles:
                     raise ValueError(f"tiles must contain valid coords")
                 coords = tile.coords
                 tiledictionary[coords] = tile
-            self._tiles = OrderedDict(tiledictionary)
+            self._tiles = tiledictionary
 
             # add tiles in _tiles to h5manager
-            for key, val in self._tiles.items():
-                self.h5manager.add_tile(val)
+            self.h5manager.add_tiles(list(self._tiles.values()))
             del self._tiles
 
     @property
     def tile_shape(self):
-        return self.h5manager.h5["tiles"].attrs["tile_shape"]
+        return readtupleh5(self.h5manager.h5["tiles"], "tile_shape")
 
     @property
     def keys(self):
-        return list(self.h5manager.h5["tiles"].keys())
+        return self.h5manager.tile_keys
+
+    @property
+    def coords(self):
+        """
+        Coords of all tiles as an array of shape (n_tiles, n_dims), in the same order as ``keys``
+        """
+        return self.h5manager.get_tile_coords()
 
     def __repr__(self):
         rep = f"{len(self.h5manager.h5['tiles'])} tiles: {reprlib.repr(list(self.h5manager.h5['tiles'].keys()))}"
         return rep
 
     def __len__(self):
-        return len(self.h5manager.h5["tiles"].keys())
+        return len(self.h5manager.h5["tiles"])
 
     def __getitem__(self, item):
         return self.h5manager.get_tile(item)
@@ -80,6 +86,20 @@ class Tiles:
             )
         self.h5manager.add_tile(tile)
 
+    def add_many(self, tiles):
+        """
+        Add several tiles, each indexed by tile.coords, to tiles.
+
+        Args:
+            tiles(list[Tile]): tile objects
+        """
+        for tile in tiles:
+            if not isinstance(tile, pathml.core.tile.Tile):
+                raise ValueError(
+                    f"can not add {type(tile)}, tile must be of type pathml.core.tiles.Tile"
+                )
+        self.h5manager.add_tiles(tiles)
+
     def update(self, tile):
         """
         Update a tile.
@@ -89,6 +109,25 @@ class Tiles:
         """
         self.h5manager.add_tile(tile)
 
+    def slice_batch(self, slicer=None, batch_size=32):
+        """
+        Read tile images in batches, extending numpy array slicing.
+
+        Args:
+            slicer: list where each element is an object of type slice indicating
+                    how the dimension should be sliced. If None, whole tiles are read.
+            batch_size(int): maximum number of tiles in each batch. Defaults to 32.
+
+        Yields:
+            tuple of (keys, batch) where keys is a list of tile keys and batch is an np.ndarray
+            of the corresponding tile images, stacked along the first axis
+        """
+        if slicer is not None and not (
+            isinstance(slicer, list) and all([isinstance(a, slice) for a in slicer])
+        ):
+            raise KeyError(f"slices must be of type list[slice] but is {type(slicer)}")
+        yield from self.h5manager.slice_tiles(slicer=slicer, batch_size=batch_size)
+
     def remove(self, key):
         """
         Remove tile from tiles.
@@ -5,7 +5,6 @@ License: GNU GPL 2.0
 
 import ast
 import tempfile
-from collections import OrderedDict
 from dataclasses import asdict
 from loguru import logger
 import anndata
@@ -14,9 +13,39 @@ import numpy as np
 import pathml.core.slide_backends
 import pathml.core.slide_data
 
+# h5py chunk cache settings (per open dataset) for files that are read in many small pieces.
+# raised from the 1 MiB default, so that recently read chunks stay decompressed between reads.
+# rdcc_nslots should be a prime number
+H5_CHUNK_CACHE = {"rdcc_nbytes": 64 * 2 ** 20, "rdcc_nslots": 10007}
+
+
+def tile_chunk_shape(shape, itemsize, max_bytes=2 ** 20):
+    """
+    Chunk shape for a dataset holding a single tile (or tile-level mask), also used for slide-level masks.
+    Uses one chunk for the whole tile, so that reading a tile only touches a single chunk.
+    For large tiles or masks, the two spatial dimensions are halved until a chunk is at most ``max_bytes``,
+    following the h5py recommendation of chunks smaller than 1 MiB.
+
+    Args:
+        shape(tuple): shape of the tile
+        itemsize(int): number of bytes per element
+        max_bytes(int): maximum size of a chunk in bytes. Defaults to 1 MiB.
+
+    Returns:
+        tuple: chunk shape
+    """
+    chunks = list(shape)
+    if len(chunks) < 2:
+        return tuple(chunks)
+    while np.prod(chunks) * itemsize > max_bytes and max(chunks[0:2]) > 1:
+        # halve the larger of the two spatial dimensions, rounding up
+        i = 0 if chunks[0] >= chunks[1] else 1
+        chunks[i] = -(-chunks[i] // 2)
+    return tuple(chunks)
+
 
 # TODO: Fletcher32 checksum?
-def writedataframeh5(h5, name, df):
+def writedataframeh5(h5, name, df, chunks=None, stack=False):
     """
     Write dataframe as h5 dataset.
 
@@ -24,13 +53,24 @@ def writedataframeh5(h5, name, df):
         h5(h5py.Dataset): root of h5 object that df will be written into
         name(str): name of dataset to be created
         df(pd.DataFrame): dataframe to be written
+        chunks(tuple, optional): chunk shape. If None, h5py picks the chunk shape, unless ``stack`` is True.
+        stack(bool, optional): Whether df is a stack of images along the first axis. If True and chunks is None,
+            each chunk holds (part of) a single image, so that reading one image only reads that image's chunks.
+            Defaults to False.
     """
+    if chunks is None:
+        shape = np.shape(df)
+        if stack and 0 not in shape:
+            itemsize = np.asarray(df).dtype.itemsize
+            chunks = (1,) + tile_chunk_shape(shape[1:], itemsize)
+        else:
+            chunks = True
     dataset = h5.create_dataset(
         str(name),
         data=df,
-        chunks=True,
-        compression="gzip",
-        compression_opts=5,
+        chunks=chunks,
+        # lzf is much faster than gzip to write and read, at a modest cost in file size
+        compression="lzf",
         shuffle=True,
     )
 
@@ -57,22 +97,36 @@ def writedicth5(h5, name, dic):
         name(str): name of dataset to be created
         dic(str): dict to be written
     """
-    h5.create_group(str(name))
-    for key, val in dic.items():
-        h5[name].attrs.create(str(key), data=val)
+    group = h5.create_group(str(name))
+    group.attrs.update({str(key): val for key, val in dic.items()})
 
 
 def writetupleh5(h5, name, tup):
     """
     Write tuple as h5 attribute.
+    Tuples of ints are stored as an integer array, so that they can be read back without parsing a string.
 
     Args:
         h5(h5py.Dataset): root of h5 object that tup will be written into
         name(str): name of dataset to be created
         tup(str): tuple to be written
     """
-    tupleasarray = np.string_(str(tup))
-    h5.attrs[str(name)] = tupleasarray
+    h5.attrs[str(name)] = tupletoh5(tup)
+
+
+def tupletoh5(tup):
+    """
+    Convert tuple to the value stored as h5 attribute by writetupleh5.
+
+    Args:
+        tup(tuple): tuple to be converted
+
+    Returns:
+        np.ndarray of int64 if all elements are ints, otherwise the tuple as a byte string
+    """
+    if all(isinstance(val, (int, np.integer)) for val in tup):
+        return np.asarray(tup, dtype=np.int64)
+    return np.bytes_(str(tup))
 
 
 def readtupleh5(h5, key):
@@ -83,7 +137,38 @@ def readtupleh5(h5, key):
         h5(h5py.Dataset or h5py.Group): h5 object that will be read from
         key(str): key where data to read is stored
     """
-    return eval(h5.attrs[key]) if key in h5.attrs.keys() else None
+    if key not in h5.attrs:
+        return None
+    val = h5.attrs[key]
+    if isinstance(val, (bytes, str)):
+        # tuples stored as strings, e.g. by older versions of PathML
+        if isinstance(val, bytes):
+            val = val.decode("utf-8")
+        return ast.literal_eval(val)
+    return tuple(val.tolist())
+
+
+def readarrayh5(ds, out=None):
+    """
+    Read a whole h5 dataset into an array.
+    Reads through the low-level h5py API, which skips the selection handling done for ``ds[:]``.
+
+    Args:
+        ds(h5py.Dataset): dataset to be read
+        out(np.ndarray, optional): C-contiguous array of the same shape as ds to read into.
+            If None, a new array is allocated.
+
+    Returns:
+        np.ndarray: contents of ds
+    """
+    if out is None:
+        out = np.empty(ds.shape, dtype=ds.dtype)
+    elif out.shape != ds.shape or not out.flags.c_contiguous:
+        raise ValueError(
+            f"out must be a C-contiguous array of shape {ds.shape}, but got shape {out.shape}"
+        )
+    ds.id.read(h5py.h5s.ALL, h5py.h5s.ALL, out)
+    return out
 
 
 def writecounts(h5, counts):
@@ -9,6 +9,7 @@ from loguru import logger
 from pathlib import Path
 
 import h5py
+from pathml.core.utils import H5_CHUNK_CACHE
 from pathml.datasets.base_data_module import BaseDataModule
 from pathml.utils import download_from_url
 from torch.utils.data import DataLoader, Dataset
@@ -111,8 +112,11 @@ class DeepFocusDataModule(BaseDataModule):
 
 class DeepFocusDataset(Dataset):
     def __init__(self, data_dir, fold_ix=None, transforms=None):
+        # use a larger chunk cache, so that chunks shared by neighbouring samples stay decompressed between reads
         self.datah5 = h5py.File(
-            str(data_dir / "outoffocus2017_patches5Classification.h5"), "r"
+            str(data_dir / "outoffocus2017_patches5Classification.h5"),
+            "r",
+            **H5_CHUNK_CACHE,
         )
         # all
         if fold_ix is None:
@@ -132,9 +136,9 @@ class DeepFocusDataset(Dataset):
             self.Y = self.datah5["Y"][183601:203999]
 
     def __len__(self):
-        return len(self.datah5["X"])
+        return len(self.X)
 
     def __getitem__(self, index: int):
-        img = self.datah5["X"][index]
-        target = self.datah5["Y"][index]
+        img = self.X[index]
+        target = self.Y[index]
         return img, target
@@ -8,6 +8,8 @@ import h5py
 import numpy as np
 import torch
 
+from pathml.core.utils import readarrayh5, readtupleh5
+
 
 class TileDataset(torch.utils.data.Dataset):
     """
@@ -35,7 +37,7 @@ class TileDataset(torch.utils.data.Dataset):
         self.file_path = file_path
         self.h5 = None
         with h5py.File(self.file_path, "r") as file:
-            self.tile_shape = eval(file["tiles"].attrs["tile_shape"])
+            self.tile_shape = readtupleh5(file["tiles"], "tile_shape")
             self.tile_keys = list(file["tiles"].keys())
             self.dataset_len = len(self.tile_keys)
             self.slide_level_labels = {
@@ -53,20 +55,24 @@ class TileDataset(torch.utils.data.Dataset):
 
         k = self.tile_keys[ix]
         ### this part copied from h5manager.get_tile()
-        tile_image = self.h5["tiles"][str(k)]["array"][:]
+        tilegroup = self.h5["tiles"][str(k)]
+        tile_image = readarrayh5(tilegroup["array"])
 
         # get corresponding masks if there are masks
-        if "masks" in self.h5["tiles"][str(k)].keys():
-            masks = {
-                mask: self.h5["tiles"][str(k)]["masks"][mask][:]
-                for mask in self.h5["tiles"][str(k)]["masks"]
-            }
+        # masks are read directly into a single array of shape (n_masks, tile_height, tile_width)
+        if "masks" in tilegroup:
+            masksgroup = tilegroup["masks"]
+            maskdatasets = [masksgroup[mask] for mask in masksgroup]
+            masks = np.empty(
+                (len(maskdatasets),) + maskdatasets[0].shape,
+                dtype=maskdatasets[0].dtype,
+            )
+            for i, ds in enumerate(maskdatasets):
+                readarrayh5(ds, out=masks[i])
         else:
             masks = None
 
-        labels = {
-            key: val for key, val in self.h5["tiles"][str(k)]["labels"].attrs.items()
-        }
+        labels = dict(tilegroup["labels"].attrs.items())
 
         if tile_image.ndim == 3:
             # swap axes from HWC to CHW for pytorch
@@ -80,6 +86,4 @@ class TileDataset(torch.utils.data.Dataset):
                 f"tile image has shape {tile_image.shape}. Expecting an image with 3 dims (HWC) or 5 dims (XYZCT)"
             )
 
-        masks = np.stack(list(masks.values()), axis=0) if masks else None
-
         return im, masks, labels, self.slide_level_labels
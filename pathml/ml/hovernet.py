@@ -501,11 +501,10 @@ def _get_gradient_hv(hv_batch, kernel_size=5):
     assert (
         hv_batch.shape[1] == 2
     ), f"inputs have shape {hv_batch.shape}. Expecting tensor of shape (B, 2, H, W)"
-    h_kernel, v_kernel = get_sobel_kernels(kernel_size, dt=hv_batch.dtype)
-
-    # move kernels to same device as batch
-    h_kernel = h_kernel.to(hv_batch.device)
-    v_kernel = v_kernel.to(hv_batch.device)
+    # kernels on same device as batch
+    h_kernel, v_kernel = get_sobel_kernels(
+        kernel_size, dt=hv_batch.dtype, device=hv_batch.device
+    )
 
     # add extra dims so we can convolve with a batch
     h_kernel = h_kernel.unsqueeze(0).unsqueeze(0)
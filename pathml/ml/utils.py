@@ -4,6 +4,8 @@ License: GNU GPL 2.0
 """
 
 # Utilities for ML module
+import functools
+
 import torch
 from torch.nn import functional as F
 import numpy as np
@@ -25,26 +27,16 @@ def center_crop_im_batch(batch, dims, batch_order="BCHW"):
         len(dims) == 2
     ), f"ERROR input cropping dims is {dims} - expecting a tuple with 2 elements total"
     assert batch_order in {
-        "BHCW",
+        "BHWC",
         "BCHW",
-    }, f"ERROR input batch order {batch_order} not recognized. Must be one of 'BHCW' or 'BCHW'"
-
-    if dims == (0, 0):
-        # no cropping necessary in this case
-        batch_cropped = batch
-    else:
-        crop_t = dims[0] // 2
-        crop_b = dims[0] - crop_t
-        crop_l = dims[1] // 2
-        crop_r = dims[1] - crop_l
-
-        if batch_order == "BHWC":
-            batch_cropped = batch[:, crop_t:-crop_b, crop_l:-crop_r, :]
-        elif batch_order == "BCHW":
-            batch_cropped = batch[:, :, crop_t:-crop_b, crop_l:-crop_r]
-        else:
-            raise Exception(f"Input batch order not valid")
-
+    }, f"ERROR input batch order {batch_order} not recognized. Must be one of 'BHWC' or 'BCHW'"
+
+    crop_t = dims[0] // 2
+    crop_l = dims[1] // 2
+    # narrow returns a view, and unlike negative-index slicing handles a crop of 0 on either side
+    h_dim, w_dim = (2, 3) if batch_order == "BCHW" else (1, 2)
+    batch_cropped = batch.narrow(h_dim, crop_t, batch.shape[h_dim] - dims[0])
+    batch_cropped = batch_cropped.narrow(w_dim, crop_l, batch.shape[w_dim] - dims[1])
     return batch_cropped
 
 
@@ -69,20 +61,18 @@ def dice_loss(true, logits, eps=1e-3):
         true.dtype == torch.long
     ), f"Input 'true' is of type {true.type}. It should be a long."
     num_classes = logits.shape[1]
+    # one-hot encode true directly in channels-first layout, with the dtype and device of logits,
+    # by scattering ones into a single zero tensor
     if num_classes == 1:
-        true_1_hot = torch.eye(num_classes + 1)[true.squeeze(1)]
-        true_1_hot = true_1_hot.permute(0, 3, 1, 2).float()
-        true_1_hot_f = true_1_hot[:, 0:1, :, :]
-        true_1_hot_s = true_1_hot[:, 1:2, :, :]
-        true_1_hot = torch.cat([true_1_hot_s, true_1_hot_f], dim=1)
+        # channel 0 is the positive class, channel 1 the negative class
+        true_1_hot = logits.new_zeros((logits.shape[0], 2) + tuple(logits.shape[2:]))
+        true_1_hot.scatter_(1, 1 - true, 1.0)
         pos_prob = torch.sigmoid(logits)
         neg_prob = 1 - pos_prob
         probas = torch.cat([pos_prob, neg_prob], dim=1)
     else:
-        true_1_hot = torch.eye(num_classes)[true.squeeze(1)]
-        true_1_hot = true_1_hot.permute(0, 3, 1, 2).float()
+        true_1_hot = torch.zeros_like(logits).scatter_(1, true, 1.0)
         probas = F.softmax(logits, dim=1)
-    true_1_hot = true_1_hot.type(logits.type())
     dims = (0,) + tuple(range(2, true.ndimension()))
     intersection = torch.sum(probas * true_1_hot, dims)
     cardinality = torch.sum(probas + true_1_hot, dims)
@@ -119,23 +109,37 @@ def dice_score(pred, truth, eps=1e-3):
     return float(num / denom)
 
 
-def get_sobel_kernels(size, dt=torch.float32):
+def get_sobel_kernels(size, dt=torch.float32, device=None):
     """
     Create horizontal and vertical Sobel kernels for approximating gradients
     Returned kernels will be of shape (size, size)
     """
     assert size % 2 == 1, "Size must be odd"
+    kernel_h, kernel_v = _sobel_kernels(size, dt)
+    # return copies of the cached kernels, so that callers can modify them,
+    # and so that kernels created under torch.inference_mode() are only used by that caller
+    return (
+        kernel_h.to(device=device, copy=True),
+        kernel_v.to(device=device, copy=True),
+    )
 
-    h_range = torch.arange(-size // 2 + 1, size // 2 + 1, dtype=dt)
-    v_range = torch.arange(-size // 2 + 1, size // 2 + 1, dtype=dt)
-    h, v = torch.meshgrid([h_range, v_range])
-    h, v = h.transpose(0, 1), v.transpose(0, 1)
 
-    kernel_h = h / (h * h + v * v + 1e-5)
-    kernel_v = v / (h * h + v * v + 1e-5)
-
-    kernel_h = kernel_h.type(dt)
-    kernel_v = kernel_v.type(dt)
+@functools.lru_cache(maxsize=32)
+def _sobel_kernels(size, dt):
+    """
+    Sobel kernels on the CPU, cached by (size, dt). Use get_sobel_kernels(), which returns copies.
+    """
+    # build outside of inference mode, otherwise the cached kernels would be inference tensors,
+    # which can not be used in later calls that are tracked by autograd
+    with torch.inference_mode(False):
+        r = torch.arange(-size // 2 + 1, size // 2 + 1, dtype=dt)
+        # h varies along columns and v along rows. broadcasting gives the (size, size) grid without a meshgrid
+        h = r.view(1, -1)
+        v = r.view(-1, 1)
+        denom = h * h + v * v + 1e-5
+
+        kernel_h = h / denom
+        kernel_v = v / denom
 
     return kernel_h, kernel_v
 
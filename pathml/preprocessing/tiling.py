@@ -22,6 +22,19 @@ def extract_tiles(arr, tile_size, stride=None):
     Returns:
         np.ndarray: Array of extracted tiles of shape `(n_tiles, tile_size, tile_size, n_channels)`
     """
+    tiles = _tile_view(arr, tile_size=tile_size, stride=stride)
+    tiles = tiles.reshape(-1, *tiles.shape[2:])
+    return tiles
+
+
+def _tile_view(arr, tile_size, stride=None):
+    """
+    View of an array as a grid of tiles, without copying.
+    See ``extract_tiles()`` for arguments.
+
+    Returns:
+        np.ndarray: view of shape `(n_tiles_i, n_tiles_j, tile_size, tile_size, n_channels)`
+    """
     assert arr.ndim == 3, f"Number of input dimensions {arr.ndim} must be 3"
     if stride is None:
         stride = tile_size
@@ -42,9 +55,7 @@ def extract_tiles(arr, tile_size, stride=None):
     strides = tuple(list(indexing_strides) + list(patch_strides))
     tiles = np.lib.stride_tricks.as_strided(arr, shape=shape, strides=strides)
     # squeeze out unnecessary axis
-    tiles = tiles.squeeze(axis=2)
-    tiles = tiles.reshape(-1, *tiles.shape[2:])
-    return tiles
+    return tiles.squeeze(axis=2)
 
 
 def extract_tiles_with_mask(arr, mask, tile_size, stride=None, threshold=0.5):
@@ -78,10 +89,11 @@ def extract_tiles_with_mask(arr, mask, tile_size, stride=None, threshold=0.5):
         arr.shape[0:2] == mask.shape[0:2]
     ), f"Dims of input image_ref {arr.shape} and mask {mask.shape} must match"
 
-    arr_tiles = extract_tiles(arr, tile_size=tile_size, stride=stride)
-    mask_tiles = extract_tiles(mask, tile_size=tile_size, stride=stride)
+    # work on views of the tile grids, so that only the tiles which are kept get copied
+    arr_tiles = _tile_view(arr, tile_size=tile_size, stride=stride)
+    mask_tiles = _tile_view(mask, tile_size=tile_size, stride=stride)
 
-    tile_mask_means = mask_tiles.mean(axis=tuple(range(1, mask_tiles.ndim)))
+    tile_mask_means = mask_tiles.mean(axis=tuple(range(2, mask_tiles.ndim)))
 
     out = arr_tiles[tile_mask_means >= threshold, ...]
     return out
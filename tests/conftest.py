@@ -9,6 +9,7 @@ import cv2
 import openslide
 import javabridge
 import scanpy as sc
+from dask.distributed import Client, LocalCluster
 
 from pathml.core import HESlide, VectraSlide, Tile, Masks, types
 
@@ -100,3 +101,16 @@ def anndata():
     """
     adata = sc.datasets.pbmc3k_processed()
     return adata
+
+
+@pytest.fixture(scope="session")
+def dask_client():
+    """
+    Dask client shared by all tests, so that the cluster is only started once per session.
+    Uses threads rather than processes, which avoids starting worker processes and pickling slides.
+    """
+    cluster = LocalCluster(n_workers=2, processes=False)
+    client = Client(cluster)
+    yield client
+    client.close()
+    cluster.close()
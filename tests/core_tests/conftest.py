@@ -48,7 +48,7 @@ def example_slide_data_with_tiles(tile):
 
 
 @pytest.fixture()
-def slide_dataset(example_slide_data_with_tiles):
+def slide_dataset():
     n = 4
     labs = {
         "test_string_label": "testlabel",
@@ -71,7 +71,7 @@ def slide_dataset(example_slide_data_with_tiles):
 
 
 @pytest.fixture()
-def slide_dataset_with_tiles(tile, example_slide_data_with_tiles):
+def slide_dataset_with_tiles(tile):
     n = 4
     labs = {
         "test_string_label": "testlabel",
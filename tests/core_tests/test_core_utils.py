@@ -0,0 +1,47 @@
+"""
+Copyright 2021, Dana-Farber Cancer Institute and Weill Cornell Medicine
+License: GNU GPL 2.0
+"""
+
+import h5py
+import numpy as np
+import pytest
+
+from pathml.core.utils import tile_chunk_shape, writedataframeh5
+
+
+@pytest.mark.parametrize(
+    "shape,chunks",
+    [
+        ((224, 224, 3), (224, 224, 3)),
+        ((1000, 1000, 3), (250, 500, 3)),
+        ((500, 500), (500, 500)),
+    ],
+)
+def test_tile_chunk_shape(shape, chunks):
+    assert tile_chunk_shape(shape, itemsize=2) == chunks
+    assert np.prod(tile_chunk_shape(shape, itemsize=2)) * 2 <= 2 ** 20
+
+
+def test_writedataframeh5_chunks(tmp_path):
+    with h5py.File(tmp_path / "test.h5", "w") as f:
+        X = np.random.randint(low=1, high=254, size=(10, 64, 64, 3), dtype=np.uint8)
+        writedataframeh5(f, "X", X, stack=True)
+        assert f["X"].chunks == (1, 64, 64, 3)
+        np.testing.assert_array_equal(f["X"][3], X[3])
+        # a single image is not treated as a stack of rows
+        writedataframeh5(f, "image", X[0])
+        assert f["image"].chunks != (1, 64, 3)
+        np.testing.assert_array_equal(f["image"][...], X[0])
+        writedataframeh5(f, "Y", X[:, 0, 0, 0])
+        assert f["Y"].chunks is not None
+        writedataframeh5(f, "Z", X, chunks=(2, 32, 32, 3))
+        assert f["Z"].chunks == (2, 32, 32, 3)
+
+
+def test_writedataframeh5_stack_chunks_capped(tmp_path):
+    with h5py.File(tmp_path / "test.h5", "w") as f:
+        X = np.zeros((2, 1024, 1024, 3), dtype=np.float32)
+        writedataframeh5(f, "X", X, stack=True)
+        assert f["X"].chunks[0] == 1
+        assert np.prod(f["X"].chunks) * X.dtype.itemsize <= 2 ** 20
@@ -5,6 +5,7 @@ License: GNU GPL 2.0
 
 import copy
 
+import h5py
 import numpy as np
 import pytest
 from pathml.core import HESlide
@@ -58,3 +59,61 @@ def test_tile_dtype_IF(tileVectra, vectra_slide):
     tile_retrieved = vectra_slide.tiles[tileVectra.coords]
     assert tile_retrieved.image.dtype == np.float16
     assert tile_retrieved.masks["testmask"].dtype == np.float16
+
+
+@pytest.mark.parametrize("compression,compression_opts", [("lzf", None), ("gzip", 5)])
+def test_tile_compression(tileHE, compression, compression_opts):
+    slidedata = HESlide(
+        "tests/testdata/small_HE.svs",
+        compression=compression,
+        compression_opts=compression_opts,
+    )
+    h5manager = slidedata.h5manager
+    h5manager.add_tile(tileHE)
+    tilegroup = h5manager.h5["tiles"][str(tileHE.coords)]
+    for ds in [tilegroup["array"], tilegroup["masks"]["testmask"]]:
+        assert ds.compression == compression
+        assert ds.compression_opts == compression_opts
+    np.testing.assert_array_equal(
+        h5manager.get_tile(tileHE.coords).image, tileHE.image.astype(np.float16)
+    )
+
+
+def test_keys_sorted_with_track_order(tmp_path, tileHE):
+    slidedata = HESlide("tests/testdata/small_HE.svs")
+    for coords in [(500, 0), (0, 500), (0, 0)]:
+        tile = copy.deepcopy(tileHE)
+        tile.coords = coords
+        slidedata.tiles.add(tile)
+    slidedata.write(tmp_path / "written.h5path")
+    # rewrite the tiles group so that it lists tiles in creation order, not by name
+    with h5py.File(tmp_path / "written.h5path", "r") as src, h5py.File(
+        tmp_path / "track_order.h5path", "w"
+    ) as f:
+        for ds in ["fields", "masks", "counts"]:
+            src.copy(ds, f)
+        tilesgroup = f.create_group("tiles", track_order=True)
+        tilesgroup.attrs.update(src["tiles"].attrs)
+        for key in ["(500, 0)", "(0, 500)", "(0, 0)"]:
+            src.copy(src["tiles"][key], tilesgroup, name=key)
+    with h5py.File(tmp_path / "track_order.h5path", "r") as f:
+        tiles = Tiles(h5pathManager(h5path=f))
+    assert tiles.keys == ["(0, 0)", "(0, 500)", "(500, 0)"]
+    tiles.remove((0, 0))
+    assert tiles.keys == ["(0, 500)", "(500, 0)"]
+    assert [tile.coords for tile in tiles] == [(0, 500), (500, 0)]
+
+
+def test_lzf_compression_opts():
+    with pytest.raises(ValueError):
+        HESlide("tests/testdata/small_HE.svs", compression="lzf", compression_opts=5)
+
+
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_in_memory(tileHE, in_memory):
+    slidedata = HESlide("tests/testdata/small_HE.svs", in_memory=in_memory)
+    assert (slidedata.h5manager.h5.driver == "core") == in_memory
+    slidedata.tiles.add(tileHE)
+    np.testing.assert_array_equal(
+        slidedata.tiles[tileHE.coords].image, tileHE.image.astype(np.float16)
+    )
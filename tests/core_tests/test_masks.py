@@ -65,6 +65,16 @@ def test_slice(smallmasks, incorrect_input):
         test = masks.slice(incorrect_input)
 
 
+def test_slice_negative_step(smallmasks):
+    slices = [slice(None, None, -1), slice(10, 2, -2)]
+    im = np.arange(np.product((224, 224, 3))).reshape((224, 224, 3))
+    for key, mask in smallmasks.slice(slices).items():
+        np.testing.assert_array_equal(mask, im[::-1, 10:2:-2])
+    np.testing.assert_array_equal(
+        smallmasks.h5manager.get_mask("mask1", slicer=slices), im[::-1, 10:2:-2]
+    )
+
+
 @pytest.mark.parametrize(
     "incorrect_input", ["string", True, 5, [5, 4, 3], {"dict": "testing"}]
 )
@@ -74,3 +84,40 @@ def test_remove(smallmasks, incorrect_input):
     with pytest.raises(KeyError):
         mask = masks["mask1"]
         masks.remove(incorrect_input)
+
+
+def test_get_by_index(smallmasks):
+    np.testing.assert_array_equal(smallmasks[0], smallmasks["mask1"])
+    np.testing.assert_array_equal(smallmasks[1], smallmasks["mask2"])
+    smallmasks.remove("mask1")
+    np.testing.assert_array_equal(smallmasks[0], smallmasks["mask2"])
+
+
+def test_update_region(smallmasks):
+    h5manager = smallmasks.h5manager
+    region = np.zeros((10, 20, 3))
+    h5manager.update_mask("mask1", region, slicer=[slice(5, 15), slice(0, 20)])
+    updated = smallmasks["mask1"]
+    np.testing.assert_array_equal(updated[5:15, 0:20], region)
+    np.testing.assert_array_equal(updated[15:], smallmasks["mask2"][15:])
+    with pytest.raises(AssertionError):
+        h5manager.update_mask("mask1", region, slicer=[slice(0, 5)])
+
+
+def test_add_from_h5_dataset(emptymasks, smallmasks):
+    source = smallmasks.h5manager.h5["masks"]["mask1"]
+    emptymasks.add("copied", source)
+    np.testing.assert_array_equal(emptymasks["copied"], smallmasks["mask1"])
+    assert emptymasks.keys == ["copied"]
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32, bool])
+def test_add_compressed(emptymasks, dtype):
+    mask = np.zeros((2000, 1000), dtype=dtype)
+    mask[100:300, 200:700] = 1
+    emptymasks.add("mask", mask)
+    ds = emptymasks.h5manager.h5["masks"]["mask"]
+    assert ds.dtype == dtype
+    assert ds.compression == "lzf"
+    assert np.prod(ds.chunks) * ds.dtype.itemsize <= 2 ** 20
+    np.testing.assert_array_equal(emptymasks["mask"], mask)
@@ -170,6 +170,19 @@ def test_tile_generator_with_level(backend, shape, tile_shape, pad, level):
     assert all([isinstance(tile, Tile) for tile in tiles])
 
 
+@pytest.mark.parametrize("prefetch", [1, 4])
+@pytest.mark.parametrize("pad", [True, False])
+def test_tile_generator_prefetch_openslide(prefetch, pad):
+    backend = openslide_backend()
+    tiles = list(backend.generate_tiles(shape=500, stride=400, pad=pad))
+    prefetched = list(
+        backend.generate_tiles(shape=500, stride=400, pad=pad, prefetch=prefetch)
+    )
+    assert [tile.coords for tile in prefetched] == [tile.coords for tile in tiles]
+    for tile, prefetched_tile in zip(tiles, prefetched):
+        np.testing.assert_array_equal(prefetched_tile.image, tile.image)
+
+
 @pytest.mark.parametrize("backend", [bioformats_backend(), bioformats_backend_qptiff()])
 @pytest.mark.parametrize("normalize", [True, False])
 def test_generate_tiles_bioformats_no_normalize(backend, normalize):
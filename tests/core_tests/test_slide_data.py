@@ -5,7 +5,6 @@ License: GNU GPL 2.0
 
 from pathlib import Path
 import pytest
-from dask.distributed import Client
 import numpy as np
 import h5py
 
@@ -46,14 +45,10 @@ def test_write_with_array_labels(tmp_path, example_slide_data):
     assert Path(tmp_path / "test_array_in_labels.h5path").is_file()
 
 
-def test_run_pipeline(example_slide_data):
+def test_run_pipeline(example_slide_data, dask_client):
     pipeline = Pipeline([BoxBlur(kernel_size=15)])
-    # start the dask client
-    client = Client()
     # run the pipeline
-    example_slide_data.run(pipeline=pipeline, client=client, tile_size=50)
-    # close the dask client
-    client.close()
+    example_slide_data.run(pipeline=pipeline, client=dask_client, tile_size=50)
 
 
 @pytest.mark.parametrize("overwrite_tiles", [True, False])
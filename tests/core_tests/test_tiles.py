@@ -4,7 +4,9 @@ License: GNU GPL 2.0
 """
 
 import pytest
+import anndata
 import numpy as np
+import pandas as pd
 
 import pathml.core.h5managers
 from pathml.core import Tiles, Tile, Masks, OpenSlideBackend, types, HESlide
@@ -161,3 +163,98 @@ def test_remove(emptytiles, tileHE, incorrect_input):
     # incorrect input
     with pytest.raises(KeyError):
         tiles.remove(incorrect_input)
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 4])
+@pytest.mark.parametrize(
+    "slicer", [[slice(0, 10), slice(5, 20)], [slice(9, None, -1), slice(5, 20)]]
+)
+def test_slice_batch(tiles, batch_size, slicer):
+    slidedata = HESlide("tests/testdata/small_HE.svs", tiles=tiles)
+    keys = []
+    for batchkeys, batch in slidedata.tiles.slice_batch(
+        slicer=slicer, batch_size=batch_size
+    ):
+        assert batch.shape == (len(batchkeys), 10, 15, 3)
+        for key, im in zip(batchkeys, batch):
+            np.testing.assert_array_equal(im, slidedata.tiles[key].image[tuple(slicer)])
+        keys.extend(batchkeys)
+    assert keys == slidedata.tiles.keys
+
+
+def test_get_tile_image_metadata(emptytiles, tileHE):
+    tiles = emptytiles
+    tiles.add(tileHE)
+    h5manager = tiles.h5manager
+    np.testing.assert_array_equal(h5manager.get_tile_image((1, 3)), tiles[(1, 3)].image)
+    np.testing.assert_array_equal(
+        h5manager.get_tile_image(0, slicer=[slice(0, 10), slice(2, 5)]),
+        tiles[0].image[0:10, 2:5],
+    )
+    out = np.empty((10, 3) + tileHE.image.shape[2:], dtype=np.float16)
+    result = h5manager.get_tile_image(
+        (1, 3), slicer=[slice(0, 10), slice(2, 5)], out=out
+    )
+    assert result is out
+    np.testing.assert_array_equal(out, tiles[(1, 3)].image[0:10, 2:5])
+    np.testing.assert_array_equal(
+        h5manager.get_tile_image(0, slicer=[slice(None, None, -1)]),
+        tiles[0].image[::-1],
+    )
+    metadata = h5manager.get_tile_metadata((1, 3))
+    assert metadata["name"] == tileHE.name
+    assert metadata["coords"] == tileHE.coords
+    assert metadata["labels"].keys() == tileHE.labels.keys()
+    with pytest.raises(KeyError):
+        h5manager.get_tile_metadata((100, 100))
+
+
+def test_coords(tiles):
+    slidedata = HESlide("tests/testdata/small_HE.svs", tiles=tiles)
+    coords = slidedata.tiles.coords
+    assert coords.shape == (len(tiles), 2)
+    for key, row in zip(slidedata.tiles.keys, coords):
+        assert tuple(row) == slidedata.tiles[key].coords
+
+
+def test_add_many(emptytiles, tiles):
+    for i, tile in enumerate(tiles[:2]):
+        tile.counts = anndata.AnnData(
+            X=np.full((3, 2), i, dtype=np.float32),
+            obs=pd.DataFrame(index=[f"{tile.name}_{k}" for k in range(3)]),
+        )
+    emptytiles.add_many(tiles)
+    assert len(emptytiles) == len(tiles)
+    for tile in tiles:
+        np.testing.assert_array_equal(
+            emptytiles[tile.coords].image, tile.image.astype(np.float16)
+        )
+    assert emptytiles.h5manager.counts.n_obs == 6
+    np.testing.assert_array_equal(
+        emptytiles.h5manager.counts.X, np.repeat([[0, 0], [1, 1]], 3, axis=0)
+    )
+    with pytest.raises(ValueError):
+        emptytiles.add_many(["string"])
+
+
+def test_counts_buffered(emptytiles, tiles):
+    for i, tile in enumerate(tiles):
+        tile.counts = anndata.AnnData(
+            X=np.full((2, 2), i, dtype=np.float32),
+            obs=pd.DataFrame(index=[f"{tile.name}_{k}" for k in range(2)]),
+        )
+        emptytiles.add(tile)
+    # overwriting a tile before counts are read replaces its counts
+    tiles[0].counts = anndata.AnnData(
+        X=np.full((2, 2), 10, dtype=np.float32),
+        obs=pd.DataFrame(index=[f"{tiles[0].name}_{k}" for k in range(2)]),
+    )
+    emptytiles.add(tiles[0])
+    counts = emptytiles.h5manager.counts
+    assert counts.n_obs == 2 * len(tiles)
+    X = np.asarray(counts.X)
+    for i, tile in enumerate(tiles):
+        expected = 10 if i == 0 else i
+        # concatenating counts appends a batch suffix to the obs names
+        rows = counts.obs_names.str.startswith(f"{tile.name}_")
+        np.testing.assert_array_equal(X[rows], np.full((2, 2), expected))
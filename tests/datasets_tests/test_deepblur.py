@@ -23,7 +23,7 @@ def create_incomplete_deepfocus_data():
     target_dir.mkdir(parents=True, exist_ok=True)
     f = h5py.File(target_dir / Path("outoffocus2017_patches5Classification.h5"), "w")
     X = np.random.randint(low=1, high=254, size=(1000, 64, 64, 3), dtype=np.uint8)
-    writedataframeh5(f, "X", X)
+    writedataframeh5(f, "X", X, stack=True)
     Y = np.random.randint(low=1, high=5, size=(204000,), dtype=np.uint8)
     writedataframeh5(f, "Y", Y)
     return f
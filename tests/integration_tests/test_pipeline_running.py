@@ -3,12 +3,9 @@ Copyright 2021, Dana-Farber Cancer Institute and Weill Cornell Medicine
 License: GNU GPL 2.0
 """
 
-import os
-
 import h5py
 import numpy as np
 import pytest
-from dask.distributed import Client, LocalCluster
 from pathml.core import HESlide, SlideData, VectraSlide
 from pathml.preprocessing import (
     BoxBlur,
@@ -28,7 +25,7 @@ from pathml.preprocessing.transforms import Transform
     "im_path", ["tests/testdata/small_HE.svs", "tests/testdata/small_dicom.dcm"]
 )
 @pytest.mark.parametrize("dist", [False, True])
-def test_pipeline_HE(tmp_path, im_path, dist):
+def test_pipeline_HE(tmp_path, im_path, dist, dask_client):
     labs = {
         "test_string_label": "testlabel",
         "test_array_label": np.array([2, 3, 4]),
@@ -40,16 +37,10 @@ def test_pipeline_HE(tmp_path, im_path, dist):
     pipeline = Pipeline(
         [BoxBlur(kernel_size=15), TissueDetectionHE(mask_name="tissue")]
     )
-    if dist:
-        cluster = LocalCluster(n_workers=2)
-        cli = Client(cluster)
-    else:
-        cli = None
+    cli = dask_client if dist else None
     slide.run(pipeline, distributed=dist, client=cli, tile_size=500)
-    save_path = str(tmp_path) + str(np.round(np.random.rand(), 8)) + "HE_slide.h5"
+    save_path = str(tmp_path / "HE_slide.h5")
     slide.write(path=save_path)
-    if dist:
-        cli.shutdown()
 
     # test out the dataset
     dataset = TileDataset(save_path)
@@ -69,18 +60,14 @@ def test_pipeline_HE(tmp_path, im_path, dist):
 # need to test tif and qptiff because they can have different behaviors due to different shapes (HWC vs HWZCT)
 @pytest.mark.parametrize("dist", [False, True])
 @pytest.mark.parametrize("tile_size", [400, (640, 480)])
-def test_pipeline_bioformats_tiff(tmp_path, dist, tile_size):
+def test_pipeline_bioformats_tiff(tmp_path, dist, tile_size, dask_client):
     slide = VectraSlide("tests/testdata/smalltif.tif")
     # use a passthru dummy pipeline
     pipeline = Pipeline([])
-    if dist:
-        cluster = LocalCluster(n_workers=2)
-        cli = Client(cluster)
-    else:
-        cli = None
+    cli = dask_client if dist else None
     slide.run(pipeline, distributed=dist, client=cli, tile_size=tile_size)
-    slide.write(path=str(tmp_path) + "tifslide.h5")
-    readslidedata = SlideData(str(tmp_path) + "tifslide.h5")
+    slide.write(path=tmp_path / "tifslide.h5")
+    readslidedata = SlideData(tmp_path / "tifslide.h5")
     assert readslidedata.name == slide.name
     np.testing.assert_equal(readslidedata.labels, slide.labels)
     if slide.masks is None:
@@ -96,14 +83,11 @@ def test_pipeline_bioformats_tiff(tmp_path, dist, tile_size):
         assert slide.counts.var.empty
     else:
         np.testing.assert_equal(readslidedata.counts.var, slide.counts.var)
-    os.remove(str(tmp_path) + "tifslide.h5")
-    if dist:
-        cli.shutdown()
 
 
 @pytest.mark.parametrize("dist", [False, True])
 @pytest.mark.parametrize("tile_size", [1000, (1920, 1440)])
-def test_pipeline_bioformats_vectra(tmp_path, dist, tile_size):
+def test_pipeline_bioformats_vectra(tmp_path, dist, tile_size, dask_client):
     deepcell = pytest.importorskip("deepcell")
     from pathml.preprocessing.transforms import SegmentMIF
 
@@ -120,16 +104,9 @@ def test_pipeline_bioformats_vectra(tmp_path, dist, tile_size):
             QuantifyMIF(segmentation_mask="cell_segmentation"),
         ]
     )
-    if dist:
-        cluster = LocalCluster(n_workers=2)
-        cli = Client(cluster)
-    else:
-        cli = None
+    cli = dask_client if dist else None
     slide.run(pipeline, distributed=dist, client=cli, tile_size=tile_size)
-    slide.write(path=str(tmp_path) + "vectraslide.h5")
-    os.remove(str(tmp_path) + "vectraslide.h5")
-    if dist:
-        cli.shutdown()
+    slide.write(path=tmp_path / "vectraslide.h5")
 
 
 def scan_hdf5(f, recursive=True, tab_step=2):
@@ -17,7 +17,7 @@ class TestingTransform(Transform):
 
     def apply(self, tile):
         tile.labels = {"testing_coords_label": tile.coords}
-        tile.masks["test"] = np.ones(tile.image.shape[0:2]) * 5
+        tile.masks["test"] = np.full(tile.image.shape[0:2], 5, dtype=np.uint8)
 
 
 @pytest.mark.parametrize(
@@ -40,7 +40,7 @@ def test_dataset(tmp_path, im_path):
     wsi = SlideData(im_path, labels=labs)
     pipeline = Pipeline([TestingTransform()])
     wsi.run(pipeline, distributed=False, tile_size=500)
-    save_path = str(tmp_path) + str(np.round(np.random.rand(), 8)) + "slide.h5"
+    save_path = str(tmp_path / "slide.h5")
     wsi.write(path=save_path)
     # load dataset from h5path, and compare to what we expect
     dataset = TileDataset(save_path)
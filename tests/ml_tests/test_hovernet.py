@@ -8,6 +8,7 @@ import torch
 import numpy as np
 
 from pathml.ml import hovernet
+from pathml.ml.utils import center_crop_im_batch, dice_loss
 
 
 def fake_hovernet_inputs(n_classes, batch_size=2):
@@ -92,3 +93,41 @@ def test_compute_hv_map():
     mask = np.random.randint(low=0, high=2, size=(256, 256))
     mask_hv = hovernet.compute_hv_map(mask)
     assert mask_hv.shape == (2, 256, 256)
+
+
+@pytest.mark.parametrize("n_classes", [1, 3])
+def test_dice_loss(n_classes):
+    true = torch.randint(low=0, high=max(n_classes, 2), size=(2, 1, 32, 32))
+    if n_classes == 1:
+        # large logits for the positive class, so that predictions match true
+        logits = (true.float() * 2 - 1) * 100
+    else:
+        logits = torch.nn.functional.one_hot(true.squeeze(1), n_classes)
+        logits = logits.permute(0, 3, 1, 2).float() * 100
+    assert dice_loss(true=true, logits=logits).item() == pytest.approx(0, abs=1e-3)
+    assert dice_loss(true=true, logits=-logits).item() > 0.5
+
+
+@pytest.mark.parametrize("dims", [(0, 0), (0, 2), (3, 5)])
+@pytest.mark.parametrize("batch_order", ["BCHW", "BHWC"])
+def test_center_crop_im_batch(dims, batch_order):
+    batch = torch.rand(size=(2, 3, 20, 24))
+    if batch_order == "BHWC":
+        batch = batch.permute(0, 2, 3, 1)
+    cropped = center_crop_im_batch(batch, dims=dims, batch_order=batch_order)
+    if batch_order == "BHWC":
+        cropped = cropped.permute(0, 3, 1, 2)
+        batch = batch.permute(0, 3, 1, 2)
+    assert cropped.shape == (2, 3, 20 - dims[0], 24 - dims[1])
+    t, l = dims[0] // 2, dims[1] // 2
+    assert torch.equal(cropped, batch[:, :, t : t + 20 - dims[0], l : l + 24 - dims[1]])
+
+
+def test_get_gradient_hv_after_inference_mode():
+    # kernels created under inference mode must not be reused in later calls tracked by autograd
+    with torch.inference_mode():
+        hovernet._get_gradient_hv(torch.rand(2, 2, 16, 16))
+    hv = torch.rand(2, 2, 16, 16, requires_grad=True)
+    h_grad, v_grad = hovernet._get_gradient_hv(hv)
+    (h_grad.sum() + v_grad.sum()).backward()
+    assert hv.grad is not None